@@ -44,9 +44,12 @@ async def chat_endpoint(
         "user": user_id,
         "time": datetime.utcnow().isoformat() + "Z",
         "query": result["question"],
+        "rewritten_query": result["rewritten_query"],
         "answer": result["answer"],
         "source": result["sources"],
-        "confidence": float(result["confidence"])
+        "confidence": float(result["confidence"]),
+        "retrieval_score": result["retrieval_score"],
+        "time_taken_seconds": result["time_taken_seconds"]
     }
     asyncio.create_task(interaction_logger.log_interaction(log_entry))
 
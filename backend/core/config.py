@@ -9,11 +9,25 @@ class Settings(BaseSettings):
     RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
     LLM_MODEL: str
     OLLAMA_HOST: str
+    OLLAMA_HOSTS: str = ""
+    OLLAMA_POOL_SIZE: int = 20
+    OLLAMA_CONNECT_TIMEOUT: float = 5.0
+    OLLAMA_READ_TIMEOUT: float = 120.0
+    OLLAMA_MAX_RETRIES: int = 2
+    OLLAMA_RETRY_BACKOFF: float = 0.5
+    OLLAMA_BREAKER_THRESHOLD: int = 5
+    OLLAMA_BREAKER_COOLDOWN: float = 30.0
+    OLLAMA_HEALTH_INTERVAL: float = 15.0
     USE_GPU_FOR_EMBEDDINGS: bool = False
 
     RAG_DATA_DIR: str
     RAG_DATA_DIR2: str
 
+    @property
+    def ollama_hosts(self) -> list[str]:
+        hosts = [h.strip() for h in self.OLLAMA_HOSTS.split(",") if h.strip()]
+        return hosts or [self.OLLAMA_HOST]
+
     @property
     def rag_data_dir_abs(self) -> str:
         return str((Path(__file__).parent.parent / self.RAG_DATA_DIR).resolve())
@@ -27,6 +41,12 @@ class Settings(BaseSettings):
     INITIAL_K: int = 20
     TOP_K: int = 5
 
+    QUERY_REWRITE_ENABLED: bool = True
+    QUERY_REWRITE_MODEL: str = ""
+    QUERY_REWRITE_MAX_TOKENS: int = 64
+    QUERY_REWRITE_TIMEOUT: float = 8.0
+    QUERY_REWRITE_CACHE_SIZE: int = 1024
+
     HOST: str = "0.0.0.0"
     PORT: int = 8000
 
@@ -22,7 +22,8 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    from backend.rag.query_rewriter import query_rewriter
+    return {"status": "ok", "query_rewriter": query_rewriter.get_stats()}
 
 app.add_middleware(
     CORSMiddleware,
@@ -40,12 +41,18 @@ app.include_router(documents.router, tags=["documents"])
 async def startup_event():
     logger.info("Loading vectorstore and initializing LLM...")
     await asyncio.to_thread(get_vectorstore)
-    from backend.rag.rag_pipeline import get_llm, get_reranker
-    await get_llm()
+    from backend.rag.rag_pipeline import get_reranker
+    from backend.rag.llm_client import get_ollama_pool
+    get_ollama_pool().start()  # Background health probe + model warm-up
     await get_reranker()  # Warm up reranker
     interaction_logger.cleanup_old_logs()
     logger.info("Backend ready")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    from backend.rag.llm_client import get_ollama_pool
+    await get_ollama_pool().close()
+
 async def periodic_cleanup():
     while True:
         await asyncio.sleep(3600)
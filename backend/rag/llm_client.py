@@ -0,0 +1,247 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, List, Optional, Set
+import httpx
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Only failures where the host never started the work are retried; a read
+# timeout means a generation may still be running, so it is not repeated.
+RETRYABLE_STATUS = {429, 503}
+HOST_DOWN_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+# Raised when a pooled keep-alive connection was closed by the server or a proxy
+STALE_CONNECTION_ERRORS = (httpx.RemoteProtocolError, httpx.ReadError)
+
+
+class OllamaError(Exception):
+    """Base class for errors raised by the Ollama client."""
+
+
+class OllamaUnavailableError(OllamaError):
+    """Raised when no Ollama host could serve a request."""
+
+
+class OllamaResponseError(OllamaError):
+    """Raised when Ollama answers with a non-retryable error status."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class _HostState:
+    """Load and circuit-breaker bookkeeping for a single Ollama host."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.in_flight = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.warmed = False
+
+    def available(self) -> bool:
+        if self.opened_at is None:
+            return True
+        # Half-open: after the cooldown let a single trial request through
+        cooled = time.monotonic() - self.opened_at >= settings.OLLAMA_BREAKER_COOLDOWN
+        return cooled and self.in_flight == 0
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info(f"Circuit closed for Ollama host {self.url}")
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.healthy = True
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= settings.OLLAMA_BREAKER_THRESHOLD:
+            if self.opened_at is None:
+                logger.warning(f"Circuit opened for Ollama host {self.url}")
+            self.opened_at = time.monotonic()
+
+
+class OllamaClientPool:
+    """Shared pooled HTTP client for one or more Ollama hosts.
+
+    - Least-loaded routing across hosts (fewest in-flight requests)
+    - Connect/read timeouts; jittered retries on another host for connect
+      errors, stale keep-alive connections, 429 and 503
+    - Per-host circuit breaker
+    - Background health probe that also warms the configured models
+
+    Callers see OllamaResponseError for non-retryable error statuses and
+    OllamaUnavailableError for everything else (exhausted retries, open
+    breakers, read timeouts, pool exhaustion).
+    """
+
+    def __init__(self, hosts: List[str], pool_size: int = 20, warm_models: Optional[List[str]] = None):
+        if not hosts:
+            raise ValueError("At least one Ollama host is required")
+        self.hosts = [_HostState(h) for h in hosts]
+        self.warm_models = warm_models or []
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=httpx.Timeout(
+                settings.OLLAMA_READ_TIMEOUT,
+                connect=settings.OLLAMA_CONNECT_TIMEOUT,
+            ),
+        )
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def _pick_host(self, exclude: Optional[Set[_HostState]] = None) -> Optional[_HostState]:
+        candidates = [h for h in self.hosts if h.healthy and h.available()]
+        if not candidates:
+            # Probe may be stale; fall back to anything the breaker lets through
+            candidates = [h for h in self.hosts if h.available()]
+        if not candidates:
+            return None
+        if exclude:
+            # Fail over to hosts this request hasn't tried yet, if there are any
+            candidates = [h for h in candidates if h not in exclude] or candidates
+        return min(candidates, key=lambda h: h.in_flight)
+
+    async def _backoff(self, attempt: int):
+        delay = min(settings.OLLAMA_RETRY_BACKOFF * (2 ** attempt), 10.0)
+        await asyncio.sleep(random.uniform(0, delay))
+
+    async def request(self, method: str, path: str, json: Optional[dict] = None,
+                      timeout: Optional[float] = None) -> dict:
+        retries = settings.OLLAMA_MAX_RETRIES
+        failed_hosts: Set[_HostState] = set()
+        last_error: Optional[Exception] = None
+
+        for attempt in range(retries + 1):
+            host = self._pick_host(exclude=failed_hosts)
+            if host is None:
+                # Every breaker is open; fail fast instead of backing off on an empty pool
+                raise OllamaUnavailableError(f"All Ollama hosts are unavailable (last error: {last_error!r})")
+
+            host.in_flight += 1
+            try:
+                response = await self.client.request(
+                    method, f"{host.url}{path}", json=json,
+                    timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+                )
+                if response.status_code in RETRYABLE_STATUS:
+                    host.record_failure()
+                    last_error = OllamaResponseError(
+                        f"Ollama {host.url}{path} returned {response.status_code}", response.status_code
+                    )
+                elif response.is_error:
+                    if response.status_code >= 500:
+                        host.record_failure()
+                    raise OllamaResponseError(
+                        f"Ollama {host.url}{path} returned {response.status_code}: {response.text[:200]}",
+                        response.status_code,
+                    )
+                else:
+                    host.record_success()
+                    return response.json()
+            except HOST_DOWN_ERRORS as e:
+                host.record_failure()
+                last_error = e
+            except STALE_CONNECTION_ERRORS as e:
+                # The connection died before a response arrived; not a breaker hit
+                last_error = e
+            except httpx.TransportError as e:
+                # Read/write timeouts mean the host is busy, not down, and pool
+                # timeouts are local saturation: no retry, no breaker hit
+                raise OllamaUnavailableError(f"Ollama request {path} to {host.url} failed: {e!r}") from e
+            finally:
+                host.in_flight -= 1
+
+            failed_hosts.add(host)
+            logger.warning(f"Ollama request to {host.url}{path} failed (attempt {attempt + 1}): {last_error!r}")
+            if attempt < retries:
+                await self._backoff(attempt)
+
+        raise OllamaUnavailableError(f"Ollama request {path} failed: {last_error!r}")
+
+    async def generate(self, model: str, prompt: str, options: Optional[Dict] = None,
+                       timeout: Optional[float] = None) -> str:
+        payload = {"model": model, "prompt": prompt, "stream": False, "options": options or {}}
+        data = await self.request("POST", "/api/generate", json=payload, timeout=timeout)
+        return data.get("response", "")
+
+    def bind(self, model: str, **options) -> "OllamaModel":
+        return OllamaModel(self, model, options)
+
+    async def probe(self):
+        async def check(host: _HostState):
+            try:
+                response = await self.client.get(f"{host.url}/api/tags", timeout=settings.OLLAMA_CONNECT_TIMEOUT)
+                response.raise_for_status()
+            except Exception as e:
+                if host.healthy:
+                    logger.warning(f"Ollama host {host.url} failed health check: {e}")
+                host.healthy = False
+                return
+            if not host.healthy:
+                logger.info(f"Ollama host {host.url} is healthy again")
+            # Breaker state is left alone: /api/tags can succeed while /api/generate fails
+            host.healthy = True
+            if not host.warmed:
+                await self._warm(host)
+
+        await asyncio.gather(*(check(h) for h in self.hosts))
+
+    async def _warm(self, host: _HostState):
+        # A generate call without a prompt only loads the model into memory
+        try:
+            for model in self.warm_models:
+                response = await self.client.post(f"{host.url}/api/generate", json={"model": model})
+                response.raise_for_status()
+            host.warmed = True
+            logger.info(f"Warmed {self.warm_models} on {host.url}")
+        except Exception as e:
+            logger.warning(f"Warm-up on {host.url} failed: {e}")
+
+    async def _probe_loop(self):
+        while True:
+            try:
+                await self.probe()
+            except Exception as e:
+                logger.error(f"Ollama health probe failed: {e}")
+            await asyncio.sleep(settings.OLLAMA_HEALTH_INTERVAL)
+
+    def start(self):
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def close(self):
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+        await self.client.aclose()
+
+
+class OllamaModel:
+    """A model name plus generation options bound to the shared pool."""
+
+    def __init__(self, pool: OllamaClientPool, model: str, options: Dict):
+        self.pool = pool
+        self.model = model
+        self.options = options
+
+    async def ainvoke(self, prompt: str, timeout: Optional[float] = None) -> str:
+        return await self.pool.generate(self.model, prompt, self.options, timeout=timeout)
+
+
+_pool: Optional[OllamaClientPool] = None
+
+
+def get_ollama_pool() -> OllamaClientPool:
+    global _pool
+    if _pool is None:
+        warm_models = [settings.LLM_MODEL]
+        if settings.QUERY_REWRITE_ENABLED and settings.QUERY_REWRITE_MODEL:
+            warm_models.append(settings.QUERY_REWRITE_MODEL)
+        _pool = OllamaClientPool(
+            settings.ollama_hosts, pool_size=settings.OLLAMA_POOL_SIZE, warm_models=warm_models
+        )
+    return _pool
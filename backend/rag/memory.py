@@ -13,6 +13,10 @@ class AsyncConversationMemory:
             if len(self.history) > self.max_turns:
                 self.history.pop(0)
 
+    async def get_turns(self) -> List[str]:
+        async with self.lock:
+            return list(self.history)
+
     async def get_history_text(self) -> str:
         async with self.lock:
             return "\n".join(self.history) if self.history else "None"
@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import List, Optional
+from langchain_core.prompts import PromptTemplate
+from backend.core.config import settings
+from backend.rag.llm_client import get_ollama_pool
+
+logger = logging.getLogger(__name__)
+
+_rewrite_llm = None
+_rewrite_llm_lock = asyncio.Lock()
+
+REWRITE_TEMPLATE = """Rewrite the Follow-up question as a single standalone question about IFSCA regulations.
+Resolve pronouns and references using the Previous questions. Do not answer it.
+Respond ONLY with the rewritten question.
+
+Previous questions (newest last):
+{history}
+
+Follow-up question: {question}
+
+Standalone question:"""
+
+
+async def get_rewrite_llm():
+    global _rewrite_llm
+    if _rewrite_llm is not None:
+        return _rewrite_llm
+    async with _rewrite_llm_lock:
+        if _rewrite_llm is None:
+            _rewrite_llm = get_ollama_pool().bind(
+                settings.QUERY_REWRITE_MODEL or settings.LLM_MODEL,
+                temperature=0,
+                num_ctx=2048,
+                num_predict=settings.QUERY_REWRITE_MAX_TOKENS
+            )
+    return _rewrite_llm
+
+
+class QueryRewriter:
+    """Condenses a follow-up question plus conversation history into a standalone search query.
+
+    Rewrites are memoized by a hash of (history, question) in a bounded LRU cache.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.cache: "OrderedDict[str, str]" = OrderedDict()
+        self.lock = asyncio.Lock()
+        self.stats = {"calls": 0, "cache_hits": 0, "skipped": 0, "failures": 0}
+
+    @staticmethod
+    def _key(turns: List[str], question: str) -> str:
+        payload = "\x1e".join(turns) + "\x1f" + question
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _get_cached(self, key: str) -> Optional[str]:
+        async with self.lock:
+            rewritten = self.cache.get(key)
+            if rewritten is not None:
+                self.cache.move_to_end(key)
+            return rewritten
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "cache_size": len(self.cache)}
+
+    async def _put_cached(self, key: str, rewritten: str):
+        async with self.lock:
+            self.cache[key] = rewritten
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+
+    async def rewrite(self, turns: List[str], question: str) -> str:
+        if not turns:
+            self.stats["skipped"] += 1
+            return question
+
+        key = self._key(turns, question)
+        cached = await self._get_cached(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+
+        self.stats["calls"] += 1
+        prompt = PromptTemplate.from_template(REWRITE_TEMPLATE).format(
+            history="\n".join(turns), question=question
+        )
+        try:
+            llm = await get_rewrite_llm()
+            response = await asyncio.wait_for(llm.ainvoke(prompt), timeout=settings.QUERY_REWRITE_TIMEOUT)
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.warning(f"Query rewrite failed: {e}")
+            return question
+
+        rewritten = response.strip().splitlines()[0].strip().strip('"') if response.strip() else ""
+        if not rewritten:
+            # Cache the fallback so repeats don't keep calling a model that returns nothing
+            self.stats["failures"] += 1
+            logger.warning("Query rewrite returned an empty response")
+            rewritten = question
+
+        await self._put_cached(key, rewritten)
+        return rewritten
+
+
+query_rewriter = QueryRewriter(max_entries=settings.QUERY_REWRITE_CACHE_SIZE)
@@ -2,9 +2,10 @@ import asyncio
 import time
 import numpy as np
 from langchain_core.prompts import PromptTemplate
-from langchain_ollama import OllamaLLM
 from backend.rag.vectorstore import get_vectorstore
 from backend.rag.memory import AsyncConversationMemory
+from backend.rag.query_rewriter import query_rewriter
+from backend.rag.llm_client import OllamaModel, get_ollama_pool
 from backend.core.config import settings
 import logging
 from sentence_transformers import CrossEncoder
@@ -23,13 +24,11 @@ async def get_llm():
         return _llm
     async with _llm_lock:
         if _llm is None:
-            _llm = OllamaLLM(
-                model=settings.LLM_MODEL,
+            _llm = get_ollama_pool().bind(
+                settings.LLM_MODEL,
                 temperature=0,
-                base_url=settings.OLLAMA_HOST,
                 num_ctx=8192
             )
-            await _llm.ainvoke("Hello")
     return _llm
 
 async def get_reranker():
@@ -44,7 +43,7 @@ async def get_reranker():
 
 vs = get_vectorstore()
 
-async def _score_faithfulness(llm: OllamaLLM, context: str, question: str, answer: str) -> float:
+async def _score_faithfulness(llm: OllamaModel, context: str, question: str, answer: str) -> float:
     faith_template = """Based on the Context, is the Answer factually grounded and relevant to the Question? Respond ONLY with 'Yes' or 'No'.
 
 Context: {context}
@@ -67,7 +66,14 @@ async def create_rag_pipeline(user_id: str, department: str, memory: AsyncConver
 
     async def process_query(question: str) -> dict:
         start = time.time()
-        search_query = f"{question} {department} department IFSCA regulations circulars"
+
+        # Condense follow-ups into a standalone question before retrieval
+        retrieval_question = question
+        if settings.QUERY_REWRITE_ENABLED:
+            retrieval_question = await query_rewriter.rewrite(await memory.get_turns(), question)
+        rewrite_time = time.time() - start
+
+        search_query = f"{retrieval_question} {department} department IFSCA regulations circulars"
 
         try:
             docs_scores = await asyncio.to_thread(
@@ -75,7 +81,7 @@ async def create_rag_pipeline(user_id: str, department: str, memory: AsyncConver
             )
             if not docs_scores:
                 docs_scores = await asyncio.to_thread(
-                    vs.similarity_search_with_relevance_scores, question, k=settings.INITIAL_K
+                    vs.similarity_search_with_relevance_scores, retrieval_question, k=settings.INITIAL_K
                 )
             docs = [d for d, s in docs_scores]
         except Exception as e:
@@ -85,11 +91,12 @@ async def create_rag_pipeline(user_id: str, department: str, memory: AsyncConver
         # Reranking
         if docs:
             reranker = await get_reranker()
-            pairs = [[question, d.page_content] for d in docs]
+            pairs = [[retrieval_question, d.page_content] for d in docs]
             rerank_scores = await asyncio.to_thread(reranker.predict, pairs, batch_size=16)
             sorted_idx = np.argsort(rerank_scores)[::-1]
             docs = [docs[i] for i in sorted_idx[:settings.TOP_K]]
             scores = rerank_scores[sorted_idx[:settings.TOP_K]].tolist()
+            retrieval_score = float(scores[0]) if scores else 0.0
             if scores:
                 min_s, max_s = min(scores), max(scores)
                 if max_s > min_s:
@@ -98,6 +105,7 @@ async def create_rag_pipeline(user_id: str, department: str, memory: AsyncConver
                     scores = [1.0] * len(scores)
         else:
             scores = []
+            retrieval_score = 0.0
 
         # Build sources — NOW FROM RAGData2!
         sources = []
@@ -154,14 +162,23 @@ Current question: {question}
 
         await memory.add_exchange(question)
 
+        time_taken = round(time.time() - start, 3)
+        logger.info(
+            f"Query done: rewrite={rewrite_time:.3f}s total={time_taken:.3f}s "
+            f"docs={len(docs)} top_rerank={retrieval_score:.3f} rewritten={retrieval_question != question} "
+            f"rewriter={query_rewriter.get_stats()}"
+        )
+
         return {
             "user_id": user_id,
             "department": department,
             "question": question,
+            "rewritten_query": retrieval_question,
             "answer": answer,
             "confidence": float(confidence),
             "sources": sources,
-            "time_taken_seconds": round(time.time() - start, 3)
+            "retrieval_score": retrieval_score,
+            "time_taken_seconds": time_taken
         }
 
     return process_query
\ No newline at end of file
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from backend.core.config import settings
+from backend.rag.llm_client import OllamaClientPool, OllamaResponseError, OllamaUnavailableError
+
+UNREACHABLE = "http://127.0.0.1:1"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self._send(self.server.tags_status, {"models": []})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.posts += 1
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        if status == "drop":
+            # Close without a response, like a stale keep-alive connection
+            self.close_connection = True
+            return
+        self._send(status, {"response": f"echo:{body.get('prompt', '')}"})
+
+    def _send(self, status: int, payload: dict):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def stub_server():
+    servers = []
+
+    def start(statuses=None, tags_status=200):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        server.statuses = list(statuses or [])
+        server.tags_status = tags_status
+        server.posts = 0
+        server.url = f"http://127.0.0.1:{server.server_port}"
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fast_settings(monkeypatch):
+    monkeypatch.setattr(settings, "OLLAMA_MAX_RETRIES", 2)
+    monkeypatch.setattr(settings, "OLLAMA_RETRY_BACKOFF", 0.01)
+    monkeypatch.setattr(settings, "OLLAMA_BREAKER_THRESHOLD", 3)
+    monkeypatch.setattr(settings, "OLLAMA_BREAKER_COOLDOWN", 60.0)
+    monkeypatch.setattr(settings, "OLLAMA_CONNECT_TIMEOUT", 1.0)
+
+
+def _run(hosts, scenario):
+    async def main():
+        pool = OllamaClientPool(hosts, pool_size=4)
+        try:
+            return await scenario(pool)
+        finally:
+            await pool.close()
+
+    return asyncio.run(main())
+
+
+def test_generate_returns_response(stub_server):
+    server = stub_server()
+
+    async def scenario(pool):
+        return await pool.bind("m").ainvoke("hi")
+
+    assert _run([server.url], scenario) == "echo:hi"
+
+
+def test_503_is_retried_then_raises(stub_server):
+    server = stub_server(statuses=[503] * 10)
+
+    async def scenario(pool):
+        with pytest.raises(OllamaUnavailableError):
+            await pool.generate("m", "hi")
+
+    _run([server.url], scenario)
+    assert server.posts == settings.OLLAMA_MAX_RETRIES + 1
+
+
+def test_503_then_success_recovers(stub_server):
+    server = stub_server(statuses=[503])
+
+    async def scenario(pool):
+        return await pool.generate("m", "hi")
+
+    assert _run([server.url], scenario) == "echo:hi"
+    assert server.posts == 2
+
+
+def test_404_is_not_retried(stub_server):
+    server = stub_server(statuses=[404])
+
+    async def scenario(pool):
+        with pytest.raises(OllamaResponseError) as exc_info:
+            await pool.generate("m", "hi")
+        assert exc_info.value.status_code == 404
+        return pool.hosts[0].consecutive_failures
+
+    assert _run([server.url], scenario) == 0
+    assert server.posts == 1
+
+
+def test_breaker_opens_and_allows_single_trial_after_cooldown(stub_server, monkeypatch):
+    server = stub_server(statuses=[503] * settings.OLLAMA_BREAKER_THRESHOLD)
+    monkeypatch.setattr(settings, "OLLAMA_MAX_RETRIES", 0)
+
+    async def scenario(pool):
+        host = pool.hosts[0]
+        for _ in range(settings.OLLAMA_BREAKER_THRESHOLD):
+            with pytest.raises(OllamaUnavailableError):
+                await pool.generate("m", "hi")
+        assert host.opened_at is not None
+        assert not host.available()
+
+        # Open breaker fails fast without touching the server
+        posts = server.posts
+        with pytest.raises(OllamaUnavailableError):
+            await pool.generate("m", "hi")
+        assert server.posts == posts
+
+        # After the cooldown exactly one trial request is let through
+        host.opened_at = time.monotonic() - settings.OLLAMA_BREAKER_COOLDOWN - 1
+        assert host.available()
+        host.in_flight += 1
+        assert not host.available()
+        host.in_flight -= 1
+
+        assert await pool.generate("m", "hi") == "echo:hi"
+        assert host.opened_at is None
+
+    _run([server.url], scenario)
+
+
+def test_probe_does_not_close_breaker(stub_server):
+    server = stub_server(statuses=[503] * 10)
+
+    async def scenario(pool):
+        host = pool.hosts[0]
+        for _ in range(settings.OLLAMA_BREAKER_THRESHOLD):
+            host.record_failure()
+        opened_at = host.opened_at
+        await pool.probe()
+        assert host.healthy
+        assert host.opened_at == opened_at
+
+    _run([server.url], scenario)
+
+
+def test_routing_picks_least_loaded_host(stub_server):
+    busy, idle = stub_server(), stub_server()
+
+    async def scenario(pool):
+        pool.hosts[0].in_flight = 3
+        pool.hosts[1].in_flight = 1
+        assert pool._pick_host() is pool.hosts[1]
+        await pool.generate("m", "hi")
+
+    _run([busy.url, idle.url], scenario)
+    assert busy.posts == 0
+    assert idle.posts == 1
+
+
+def test_retry_fails_over_to_another_host(stub_server):
+    server = stub_server()
+
+    async def scenario(pool):
+        return await pool.generate("m", "hi")
+
+    # No probe has run, so the dead host is still marked healthy and listed first
+    assert _run([UNREACHABLE, server.url], scenario) == "echo:hi"
+    assert server.posts == 1
+
+
+def test_dropped_connection_is_retried(stub_server):
+    server = stub_server(statuses=["drop"])
+
+    async def scenario(pool):
+        result = await pool.generate("m", "hi")
+        return result, pool.hosts[0].consecutive_failures
+
+    assert _run([server.url], scenario) == ("echo:hi", 0)
+    assert server.posts == 2
+
+
+def test_probe_marks_unreachable_host_unhealthy(stub_server):
+    server = stub_server()
+
+    async def scenario(pool):
+        await pool.probe()
+        return [h.healthy for h in pool.hosts]
+
+    assert _run([server.url, UNREACHABLE], scenario) == [True, False]
@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from backend.core.config import settings
+from backend.rag import query_rewriter as rewriter_module
+from backend.rag.query_rewriter import QueryRewriter
+
+
+class _FakeLLM:
+    def __init__(self, response: str = "What are the fees for ancillary services?", delay: float = 0.0):
+        self.response = response
+        self.delay = delay
+        self.calls = 0
+
+    async def ainvoke(self, prompt: str) -> str:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.response
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    llm = _FakeLLM()
+
+    async def get_rewrite_llm():
+        return llm
+
+    monkeypatch.setattr(rewriter_module, "get_rewrite_llm", get_rewrite_llm)
+    return llm
+
+
+def test_no_history_skips_llm(fake_llm):
+    rewriter = QueryRewriter()
+    assert asyncio.run(rewriter.rewrite([], "What is TechFin?")) == "What is TechFin?"
+    assert fake_llm.calls == 0
+    assert rewriter.stats["skipped"] == 1
+
+
+def test_same_history_and_question_hits_cache(fake_llm):
+    rewriter = QueryRewriter()
+    turns = ["What is an ancillary service provider?"]
+
+    async def scenario():
+        first = await rewriter.rewrite(turns, "what about its fees?")
+        second = await rewriter.rewrite(turns, "what about its fees?")
+        return first, second
+
+    assert asyncio.run(scenario()) == (fake_llm.response, fake_llm.response)
+    assert fake_llm.calls == 1
+    assert rewriter.stats["cache_hits"] == 1
+
+
+def test_lru_evicts_oldest_entry(fake_llm):
+    rewriter = QueryRewriter(max_entries=2)
+    turns = ["What is TechFin?"]
+
+    async def scenario():
+        await rewriter.rewrite(turns, "q1")
+        await rewriter.rewrite(turns, "q2")
+        await rewriter.rewrite(turns, "q1")  # refresh q1 so q2 is the oldest
+        await rewriter.rewrite(turns, "q3")
+        await rewriter.rewrite(turns, "q1")
+        await rewriter.rewrite(turns, "q2")
+
+    asyncio.run(scenario())
+    assert len(rewriter.cache) == 2
+    # q1, q2, q3 and the evicted q2 again; the q1 repeats were cache hits
+    assert fake_llm.calls == 4
+
+
+def test_timeout_falls_back_to_question(fake_llm, monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_REWRITE_TIMEOUT", 0.01)
+    fake_llm.delay = 1.0
+    rewriter = QueryRewriter()
+
+    result = asyncio.run(rewriter.rewrite(["What is TechFin?"], "and its fees?"))
+    assert result == "and its fees?"
+    assert rewriter.stats["failures"] == 1
+    assert len(rewriter.cache) == 0
+
+
+def test_empty_response_counts_failure_and_caches_fallback(fake_llm):
+    fake_llm.response = "   "
+    rewriter = QueryRewriter()
+    turns = ["What is TechFin?"]
+
+    async def scenario():
+        first = await rewriter.rewrite(turns, "and its fees?")
+        second = await rewriter.rewrite(turns, "and its fees?")
+        return first, second
+
+    assert asyncio.run(scenario()) == ("and its fees?", "and its fees?")
+    assert fake_llm.calls == 1
+    assert rewriter.stats["failures"] == 1